@@ -26,7 +26,11 @@ bl_info = {
 
 import os
 import bpy
+from bisect import bisect_left, bisect_right
 from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+from bpy.app.handlers import persistent
 from bpy.props import (StringProperty,
 					   BoolProperty,
 					   IntProperty,
@@ -34,13 +38,40 @@ from bpy.props import (StringProperty,
 					   EnumProperty,
 					   PointerProperty,
 					   FloatVectorProperty,
+					   CollectionProperty,
 					   )
 from bpy.types import (Menu,
 					   Panel,
 					   Operator,
 					   PropertyGroup,
+					   UIList,
 					   )
 
+# Step Properties
+class StepTools_step(PropertyGroup):
+	frame_start: IntProperty(
+		name="Start",
+		description="First frame of step"
+	)
+	frame_end: IntProperty(
+		name="End",
+		description="First frame after step"
+	)
+	count: IntProperty(
+		name="Objects",
+		description="Number of objects animated in step"
+	)
+	overlap: BoolProperty(
+		name="Overlap",
+		description="Animation of step continues into the next step"
+	)
+
+def update_preview_solid(self, context):
+	if self.preview_solid:
+		steptools_preview_update(context.scene, context.evaluated_depsgraph_get())
+	else:
+		steptools_preview_restore(context.scene, clear=True)
+
 # Scene Properties
 class StepTools_properties(PropertyGroup):
 	step_type: EnumProperty(
@@ -151,6 +182,356 @@ class StepTools_properties(PropertyGroup):
 		description="Make single user for data object",
 		default = False
 	)
+	preview_solid: BoolProperty(
+		name="Solid Preview",
+		description="Mirror blinks and transparency to object color. Visible in Solid mode with Color set to Object. Instanced objects are not previewed",
+		default = False,
+		update = update_preview_solid
+	)
+
+	# Property for steps
+	steps: CollectionProperty(type=StepTools_step)
+	active_step: IntProperty(
+		name="Step",
+		description="Active step",
+		default = 0,
+		min = 0
+	)
+
+# Step index
+# Half-open frame intervals [start, end) where blink or transparency change, per object.
+# Objects are keyed by session_uid, so a renamed object keeps its entry.
+# Intervals are cut into elementary segments, so a frame query is a bisect over segment bounds.
+class StepToolsIndex:
+	data_paths = ('["StepTools_Blink"]', '["StepTools_Transparent"]')
+
+	def __init__(self):
+		self.scene = None
+		self.intervals = {}
+		self.names = {}
+		self.actions = {}
+		self.breakpoints = []
+		self.segments = []
+		self.bounds = None
+		self.dirty = None
+		self.changed = True
+		self.expired = True
+		self.version = 0
+
+	def check(self, scene):
+		# Full rebuild after undo, file load or scene switch
+		if self.expired or self.scene != scene.name:
+			self.scene = scene.name
+			self.intervals = {}
+			self.names = {}
+			self.actions = {}
+			self.changed = True
+			for object in scene.objects:
+				self.read_object(object)
+			self.expired = False
+		if self.changed:
+			self.build()
+
+	def update(self, scene, objects):
+		if self.expired or self.scene != scene.name:
+			self.check(scene)
+			return
+		for object in objects:
+			self.read_object(object)
+
+	def read_object(self, object):
+		# Blink color is keyed only at the ends of a blink, so it does not make intervals
+		intervals = []
+		action = object.animation_data.action if object.animation_data else None
+		if action:
+			for fcurve in action.fcurves:
+				if fcurve.data_path not in self.data_paths:
+					continue
+				count = len(fcurve.keyframe_points)
+				points = [0.0] * count * 2
+				fcurve.keyframe_points.foreach_get("co", points)
+				# Keep only keyframe pairs where the value changes
+				for i in range(0, count * 2 - 2, 2):
+					if points[i + 1] != points[i + 3]:
+						intervals.append((points[i], points[i + 2]))
+		intervals = self.merge(intervals)
+
+		uid = object.session_uid
+		if intervals:
+			self.names[uid] = object.name
+			self.actions[uid] = action.session_uid
+		else:
+			self.names.pop(uid, None)
+			self.actions.pop(uid, None)
+
+		old = self.intervals.get(uid, [])
+		if old == intervals:
+			return False
+		if intervals:
+			self.intervals[uid] = intervals
+		else:
+			del self.intervals[uid]
+		if not self.changed:
+			self.patch(uid, old, intervals)
+		return True
+
+	def remove_missing(self, scene):
+		uids = {object.session_uid for object in scene.objects}
+		missing = [uid for uid in self.intervals if uid not in uids]
+		for uid in missing:
+			old = self.intervals.pop(uid)
+			self.names.pop(uid, None)
+			self.actions.pop(uid, None)
+			if not self.changed:
+				self.patch(uid, old, [])
+		return bool(missing)
+
+	def users(self, action):
+		return [uid for uid, action_uid in self.actions.items() if action_uid == action.session_uid]
+
+	def resolve(self, uids, objects):
+		# Look up objects by cached name
+		found = []
+		missing = set()
+		for uid in uids:
+			object = objects.get(self.names.get(uid, ""))
+			if object is not None and object.session_uid == uid:
+				found.append(object)
+			else:
+				missing.add(uid)
+
+		# Names are out of date after a rename, refresh them in one pass
+		if missing:
+			for object in objects:
+				if object.session_uid in missing:
+					self.names[object.session_uid] = object.name
+					found.append(object)
+		return sorted(found, key=lambda object: object.name)
+
+	@staticmethod
+	def merge(intervals):
+		# Join overlapping intervals only, touching ones stay separate steps
+		merged = []
+		for start, end in sorted(intervals):
+			if merged and start < merged[-1][1]:
+				merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+			else:
+				merged.append((start, end))
+		return merged
+
+	def build(self):
+		events = []
+		for uid, intervals in self.intervals.items():
+			for start, end in intervals:
+				events.append((start, 1, uid))
+				events.append((end, -1, uid))
+		events.sort()
+
+		self.breakpoints = []
+		self.segments = []
+		active = set()
+		for frame, group in groupby(events, key=itemgetter(0)):
+			for _, change, uid in group:
+				if change > 0:
+					active.add(uid)
+				else:
+					active.discard(uid)
+			self.breakpoints.append(frame)
+			self.segments.append(frozenset(active))
+		self.changed = False
+		self.dirty = (float("-inf"), float("inf"))
+		self.version += 1
+
+	def patch(self, uid, old, new):
+		# Update only the segments in the frame range of the changed object.
+		# Bounds no longer used are kept, they split a segment without changing queries.
+		start = min(interval[0] for interval in old + new)
+		end = max(interval[1] for interval in old + new)
+
+		for frame in sorted({frame for interval in new for frame in interval}):
+			i = bisect_left(self.breakpoints, frame)
+			if i == len(self.breakpoints) or self.breakpoints[i] != frame:
+				self.breakpoints.insert(i, frame)
+				self.segments.insert(i, self.segments[i - 1] if i > 0 else frozenset())
+
+		k = 0
+		for i in range(bisect_left(self.breakpoints, start), bisect_left(self.breakpoints, end)):
+			frame = self.breakpoints[i]
+			while k < len(new) and new[k][1] <= frame:
+				k += 1
+			active = k < len(new) and new[k][0] <= frame
+			segment = self.segments[i]
+			if active != (uid in segment):
+				self.segments[i] = segment | {uid} if active else segment - {uid}
+
+		if self.dirty:
+			start, end = min(start, self.dirty[0]), max(end, self.dirty[1])
+		self.dirty = (start, end)
+		self.version += 1
+
+	def at_frame(self, scene, frame):
+		self.check(scene)
+		i = bisect_right(self.breakpoints, frame) - 1
+		return self.segments[i] if i >= 0 else frozenset()
+
+	def in_range(self, scene, start, end):
+		self.check(scene)
+		first = max(bisect_right(self.breakpoints, start) - 1, 0)
+		last = bisect_left(self.breakpoints, end)
+		return frozenset().union(*self.segments[first:last])
+
+	def spanning(self, scene, frame):
+		# Objects with a single interval crossing the frame
+		found = set()
+		for uid in self.at_frame(scene, frame):
+			intervals = self.intervals[uid]
+			i = bisect_left(intervals, (frame,)) - 1
+			if i >= 0 and intervals[i][1] > frame:
+				found.add(uid)
+		return found
+
+	@staticmethod
+	def get_bounds(scene):
+		# Steps are separated by markers 'P', the last step includes the scene end frame
+		markers = sorted({marker.frame for marker in scene.timeline_markers if marker.name == "P"})
+		bounds = [scene.frame_start] + [frame for frame in markers if frame > scene.frame_start]
+		if scene.frame_end + 1 > bounds[-1]:
+			bounds.append(scene.frame_end + 1)
+		return bounds
+
+	def sync_steps(self, scene):
+		# Rewrite only steps in the changed frame range, unless markers moved
+		self.check(scene)
+		bounds = self.get_bounds(scene)
+		if self.bounds != (scene.name, bounds):
+			self.bounds = (scene.name, bounds)
+			self.dirty = (float("-inf"), float("inf"))
+		if not self.dirty:
+			return
+		dirty_start, dirty_end = self.dirty
+		self.dirty = None
+
+		steps = scene.property.steps
+		while len(steps) > len(bounds) - 1:
+			steps.remove(len(steps) - 1)
+		while len(steps) < len(bounds) - 1:
+			steps.add()
+
+		for id, step in enumerate(steps):
+			start, end = bounds[id], bounds[id + 1]
+			if end < dirty_start or start > dirty_end:
+				continue
+			values = {
+				"name": f"Step {id + 1}",
+				"frame_start": start,
+				"frame_end": end,
+				"count": len(self.in_range(scene, start, end)),
+				"overlap": id < len(steps) - 1 and bool(self.spanning(scene, end)),
+			}
+			# Skip unchanged values to avoid extra depsgraph updates
+			for key, value in values.items():
+				if getattr(step, key) != value:
+					setattr(step, key, value)
+		scene.property.active_step = min(scene.property.active_step, max(len(steps) - 1, 0))
+
+step_index = StepToolsIndex()
+
+@persistent
+def steptools_index_expire(*args):
+	step_index.expired = True
+
+# Keep index and steps current after edits outside of StepTools operators
+@persistent
+def steptools_index_update(scene, depsgraph):
+	step_index.check(scene)
+	scene_updated = False
+	for update in depsgraph.updates:
+		id = update.id.original
+		if isinstance(id, bpy.types.Object):
+			if id.session_uid in step_index.intervals or "StepTools_Blink" in id:
+				step_index.read_object(id)
+		elif isinstance(id, bpy.types.Action):
+			for object in step_index.resolve(step_index.users(id), bpy.data.objects):
+				step_index.read_object(object)
+		elif isinstance(id, (bpy.types.Scene, bpy.types.Collection)):
+			scene_updated = True
+	if scene_updated:
+		step_index.remove_missing(scene)
+
+	# Leave scenes without StepTools animation untouched
+	if not step_index.intervals and not scene.property.steps:
+		return
+	step_index.sync_steps(scene)
+
+# Solid preview
+preview_suspended = False
+preview_frame = None
+
+@persistent
+def steptools_preview_update(scene, depsgraph=None):
+	global preview_frame
+	if preview_suspended or not scene.property.preview_solid:
+		return
+
+	# Only objects animated between the last previewed frame and this one can change
+	step_index.check(scene)
+	frame = scene.frame_current_final
+	if preview_frame and preview_frame[:2] == (scene.name, step_index.version):
+		start, end = sorted((preview_frame[2], frame))
+		uids = step_index.in_range(scene, start, end + 1)
+	else:
+		uids = step_index.intervals
+		# Restore objects that are no longer animated
+		for object in scene.objects:
+			if "StepTools_Preview_Base" in object and object.session_uid not in uids:
+				object.color = object["StepTools_Preview_Base"]
+				del object["StepTools_Preview_Base"]
+	preview_frame = (scene.name, step_index.version, frame)
+
+	for object in step_index.resolve(uids, scene.objects):
+		if "StepTools_Preview_Base" not in object:
+			object["StepTools_Preview_Base"] = object.color[:]
+
+		evaluated = object.evaluated_get(depsgraph) if depsgraph else object
+		base = object["StepTools_Preview_Base"]
+		blink = evaluated.get("StepTools_Blink", 0.0)
+		blink_color = evaluated.get("StepTools_Blink_Color", (1.0, 0.0, 0.0))
+		transparent = evaluated.get("StepTools_Transparent", 0.0)
+
+		color = [base[i] + (blink_color[i] - base[i]) * blink for i in range(3)]
+		color.append(base[3] * (1.0 - transparent))
+		# Skip unchanged objects to avoid extra depsgraph updates
+		if any(abs(a - b) > 1e-4 for a, b in zip(object.color, color)):
+			object.color = color
+
+def steptools_preview_restore(scene, clear=False):
+	global preview_frame
+	preview_frame = None
+	for object in scene.objects:
+		if "StepTools_Preview_Base" in object:
+			object.color = object["StepTools_Preview_Base"]
+			if clear:
+				del object["StepTools_Preview_Base"]
+
+# Keep object color out of renders and saved files, handlers may get no scene
+@persistent
+def steptools_preview_suspend(*args):
+	global preview_suspended
+	scenes = [scene for scene in bpy.data.scenes if scene.property.preview_solid]
+	if not scenes:
+		return
+	preview_suspended = True
+	for scene in scenes:
+		steptools_preview_restore(scene, clear=True)
+
+@persistent
+def steptools_preview_resume(*args):
+	global preview_suspended
+	if not preview_suspended:
+		return
+	preview_suspended = False
+	for scene in bpy.data.scenes:
+		steptools_preview_update(scene)
 
 # Blink
 class StepToolsMain(Operator):
@@ -159,7 +540,7 @@ class StepToolsMain(Operator):
 	bl_options = {"REGISTER", "UNDO"}
 
 	def execute(self, context):
-		selected_objects = [obj for obj in bpy.context.selected_objects if obj.data is not None]
+		selected_objects = [obj for obj in bpy.context.selected_objects if obj.data is not None or self.is_instancer(obj)]
 
 		# Get all materials
 		all_materials = []
@@ -171,7 +552,7 @@ class StepToolsMain(Operator):
 		self.objects = []
 		for object in selected_objects:
 			# Create single user object (if needed)
-			if context.scene.property.single_user_data and object.data.users > 1:
+			if context.scene.property.single_user_data and object.data is not None and object.data.users > 1:
 				object.data = object.data.copy()
 			
 			for id, slot in enumerate(object.material_slots):
@@ -194,6 +575,17 @@ class StepToolsMain(Operator):
 					# Add object to list	
 					if not object in self.objects:
 						self.objects.append(object)
+
+		# Materials of instanced objects (properties are keyed on the instancer)
+		instancers = [obj for obj in selected_objects if self.is_instancer(obj)]
+		if instancers:
+			instanced_materials = self.get_instanced_materials(context, instancers)
+			for object in instancers:
+				for material in instanced_materials.get(object.name, []):
+					if not material in materials:
+						materials.append(material)
+					if not object in self.objects:
+						self.objects.append(object)
 		
 		# Check materials group 
 		for material in materials:
@@ -210,6 +602,8 @@ class StepToolsMain(Operator):
 			steptools_group = [group for group in groups if "StepTools" in group.node_tree.name]
 			if not steptools_group:
 				self.create_group(context, material_output[0], material_nodes, links)
+			else:
+				self.update_group(steptools_group[0].node_tree)
 		
 		
 		for object in self.objects:
@@ -227,6 +621,44 @@ class StepToolsMain(Operator):
 				bpy.data.actions.remove(action)
 		return {"FINISHED"}
 
+	@staticmethod
+	def is_instancer(object):
+		if object.instance_type != "NONE":
+			return True
+		return any(modifier.type == "NODES" for modifier in object.modifiers)
+
+	def get_instanced_materials(self, context, instancers):
+		names = {obj.name for obj in instancers}
+		instanced_materials = {}
+		seen = set()
+		depsgraph = context.evaluated_depsgraph_get()
+		for instance in depsgraph.object_instances:
+			if not instance.is_instance or instance.parent is None:
+				continue
+			parent = instance.parent.original
+			if parent.name not in names:
+				continue
+
+			# Read each instanced object once per instancer.
+			# Geometry instances have the instancer as original, so their data tells them apart
+			key = (parent.name, instance.object.original.name, instance.object.data)
+			if key in seen:
+				continue
+			seen.add(key)
+
+			materials = instanced_materials.setdefault(parent.name, set())
+			for slot in instance.object.material_slots:
+				if slot.material and slot.material.use_nodes:
+					materials.add(slot.material.original)
+		return {name: list(materials) for name, materials in instanced_materials.items()}
+
+	# Read properties from instancer, fall back to the object itself
+	def update_group(self, group):
+		for node in group.nodes:
+			if node.type == "ATTRIBUTE" and node.attribute_name.startswith('["StepTools_'):
+				node.attribute_type = 'INSTANCER'
+		return {"FINISHED"}
+
 	def create_group(self, context, material_output, material_nodes, links):
 		# Create input \ output nodes
 		group = bpy.data.node_groups.new("StepTools", "ShaderNodeTree")
@@ -248,12 +680,12 @@ class StepToolsMain(Operator):
 		
 		attr_blink = group.nodes.new(type='ShaderNodeAttribute')
 		attr_blink.location = (300, 300)
-		attr_blink.attribute_type = 'OBJECT'
+		attr_blink.attribute_type = 'INSTANCER'
 		attr_blink.attribute_name = '["StepTools_Blink"]'
 		
 		attr_blink_color = group.nodes.new(type='ShaderNodeAttribute')
 		attr_blink_color.location = (0, -130)
-		attr_blink_color.attribute_type = 'OBJECT'
+		attr_blink_color.attribute_type = 'INSTANCER'
 		attr_blink_color.attribute_name = '["StepTools_Blink_Color"]'
 		
 		# Nodes for transparency
@@ -267,7 +699,7 @@ class StepToolsMain(Operator):
 		
 		attr_transparent = group.nodes.new(type='ShaderNodeAttribute')
 		attr_transparent.location = (600, 300)
-		attr_transparent.attribute_type = 'OBJECT'
+		attr_transparent.attribute_type = 'INSTANCER'
 		attr_transparent.attribute_name = '["StepTools_Transparent"]'
 		
 		# Create link
@@ -351,7 +783,9 @@ class StepToolsBlink(StepToolsMain):
 					object["StepTools_Blink_Color"] = context.scene.property.color_blink
 					object.update_tag()
 					object.keyframe_insert(data_path='["StepTools_Blink_Color"]', frame=frame)
+		step_index.update(context.scene, self.objects)
 		StepToolsCursor.execute(self, context)
+		step_index.sync_steps(context.scene)
 		return {"FINISHED"}
 
 class StepToolsTransparent(StepToolsMain):
@@ -390,7 +824,9 @@ class StepToolsTransparent(StepToolsMain):
 				object["StepTools_Transparent"] = value
 				object.update_tag()
 				object.keyframe_insert(data_path='["StepTools_Transparent"]', frame = frame)
+		step_index.update(context.scene, self.objects)
 		StepToolsCursor.execute(self, context)
+		step_index.sync_steps(context.scene)
 		return {"FINISHED"}
 
 class StepToolsCursor(Operator):
@@ -445,6 +881,58 @@ class StepToolsMarker(Operator):
 	def execute(self, context):
 		curent_frame = bpy.context.scene.frame_current
 		context.scene.timeline_markers.new('P', frame=curent_frame)
+		step_index.sync_steps(context.scene)
+		return {'FINISHED'}
+
+# Steps
+class StepToolsStepRefresh(Operator):
+	bl_idname = "action.steptools_step_refresh"
+	bl_label = "Refresh Steps"
+	bl_description = "Rebuild steps from keyframes and markers 'P'"
+	bl_options = {"REGISTER", "UNDO"}
+
+	def execute(self, context):
+		step_index.expired = True
+		step_index.sync_steps(context.scene)
+		return {'FINISHED'}
+
+class StepToolsStepJump(Operator):
+	bl_idname = "action.steptools_step_jump"
+	bl_label = "Jump to Step"
+	bl_description = "Move timeline cursor to start of active step"
+	bl_options = {"REGISTER", "UNDO"}
+
+	@classmethod
+	def poll(cls, context):
+		return context.scene.property.active_step < len(context.scene.property.steps)
+
+	def execute(self, context):
+		step = context.scene.property.steps[context.scene.property.active_step]
+		context.scene.frame_set(step.frame_start)
+		return {'FINISHED'}
+
+class StepToolsStepSelect(Operator):
+	bl_idname = "action.steptools_step_select"
+	bl_label = "Select Objects in Step"
+	bl_description = "Select objects animated in active step"
+	bl_options = {"REGISTER", "UNDO"}
+
+	@classmethod
+	def poll(cls, context):
+		return context.scene.property.active_step < len(context.scene.property.steps)
+
+	def execute(self, context):
+		step = context.scene.property.steps[context.scene.property.active_step]
+		uids = step_index.in_range(context.scene, step.frame_start, step.frame_end)
+		objects = step_index.resolve(uids, context.view_layer.objects)
+
+		for obj in context.selected_objects:
+			obj.select_set(False)
+		for obj in objects:
+			obj.select_set(True)
+		if objects:
+			context.view_layer.objects.active = objects[0]
+		self.report({'INFO'}, f"Selected {len(objects)} objects.")
 		return {'FINISHED'}
 
 class StepToolsMarkerSave(Operator):
@@ -607,6 +1095,36 @@ class STEPTOOLS_PT_subpanel_blink(StepToolsDopeSheet, Panel):
 		row.scale_x = 1
 		row.operator(StepToolsMarker.bl_idname, text="", icon="MARKER_HLT")
 
+class STEPTOOLS_UL_steps(UIList):
+	def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+		frame = context.scene.frame_current
+		current = item.frame_start <= frame < item.frame_end
+		row = layout.row(align=True)
+		row.label(text=item.name, icon="PLAY" if current else "BLANK1")
+		row.label(text=f"{item.frame_start} - {item.frame_end - 1}")
+		row.label(text=str(item.count), icon="OBJECT_DATA")
+		row.label(text="", icon="ERROR" if item.overlap else "BLANK1")
+
+class STEPTOOLS_PT_subpanel_steps(StepToolsDopeSheet, Panel):
+	bl_parent_id = "STEPTOOLS_PT_dopesheet_panel"
+	bl_label = "Steps"
+
+	def draw(self, context):
+		layout = self.layout
+		row = layout.row()
+		row.template_list("STEPTOOLS_UL_steps", "", context.scene.property, "steps",
+						  context.scene.property, "active_step", rows=5)
+
+		col = row.column(align=True)
+		col.operator(StepToolsStepRefresh.bl_idname, text="", icon="FILE_REFRESH")
+		col.separator()
+		col.operator(StepToolsStepJump.bl_idname, text="", icon="TIME")
+		col.operator(StepToolsStepSelect.bl_idname, text="", icon="RESTRICT_SELECT_OFF")
+
+		frame = context.scene.frame_current
+		count = len(step_index.at_frame(context.scene, frame))
+		layout.label(text=f"Frame {frame}: {count} objects animated")
+
 class STEPTOOLS_PT_subpanel_settings(StepToolsDopeSheet, Panel):
 	bl_parent_id = "STEPTOOLS_PT_dopesheet_panel"
 	bl_label = "Settings"
@@ -633,6 +1151,8 @@ class STEPTOOLS_PT_subpanel_settings(StepToolsDopeSheet, Panel):
 		col_right.prop(context.scene.property, "single_user_material")
 		col_right.prop(context.scene.property, "single_user_data")
 
+		col.prop(context.scene.property, "preview_solid")
+
 		split = col.split(factor=0.4)
 		split.alignment = 'RIGHT'
 		split.label(text="Save Marker:")
@@ -688,6 +1208,7 @@ class STEPTOOLS_MT_submenu(Menu):
 		layout.operator(StepToolsMarker.bl_idname)
 
 classes = (
+	StepTools_step,
 	StepTools_properties,
 	StepToolsMain,
 	StepToolsBlink,
@@ -699,8 +1220,13 @@ classes = (
 	StepToolsMarkerSave,
 	StepToolsMarker,
 	StepToolsPause,
+	StepToolsStepRefresh,
+	StepToolsStepJump,
+	StepToolsStepSelect,
+	STEPTOOLS_UL_steps,
 	STEPTOOLS_PT_dopesheet_panel,
 	STEPTOOLS_PT_subpanel_blink,
+	STEPTOOLS_PT_subpanel_steps,
 	STEPTOOLS_PT_subpanel_settings,
 	STEPTOOLS_MT_menu,
 	STEPTOOLS_MT_submenu,
@@ -714,12 +1240,39 @@ def register():
 	bpy.types.Scene.property = PointerProperty(type = StepTools_properties)
 	bpy.types.DOPESHEET_MT_key.append(STEPTOOLS_MT_menu.draw)
 
+	for handler in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+		handler.append(steptools_index_expire)
+	bpy.app.handlers.depsgraph_update_post.append(steptools_index_update)
+	bpy.app.handlers.frame_change_post.append(steptools_preview_update)
+	for handler in (bpy.app.handlers.render_init, bpy.app.handlers.save_pre):
+		handler.append(steptools_preview_suspend)
+	for handler in (bpy.app.handlers.render_complete, bpy.app.handlers.render_cancel, bpy.app.handlers.save_post):
+		handler.append(steptools_preview_resume)
+
 def unregister():
+	for scene in bpy.data.scenes:
+		if scene.property.preview_solid:
+			steptools_preview_restore(scene, clear=True)
+
 	for cls in reversed(classes):
 		bpy.utils.unregister_class(cls)
 	
 	del bpy.types.Scene.property
 	bpy.types.DOPESHEET_MT_key.remove(STEPTOOLS_MT_menu.draw)
 
+	for handler in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+		if steptools_index_expire in handler:
+			handler.remove(steptools_index_expire)
+	if steptools_index_update in bpy.app.handlers.depsgraph_update_post:
+		bpy.app.handlers.depsgraph_update_post.remove(steptools_index_update)
+	for handler, function in ((bpy.app.handlers.frame_change_post, steptools_preview_update),
+							  (bpy.app.handlers.render_init, steptools_preview_suspend),
+							  (bpy.app.handlers.render_complete, steptools_preview_resume),
+							  (bpy.app.handlers.render_cancel, steptools_preview_resume),
+							  (bpy.app.handlers.save_pre, steptools_preview_suspend),
+							  (bpy.app.handlers.save_post, steptools_preview_resume)):
+		if function in handler:
+			handler.remove(function)
+
 if __name__ == "__main__" :
 	register()
\ No newline at end of file